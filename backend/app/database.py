@@ -2,43 +2,57 @@ from fastapi import HTTPException
 import pyodbc
 import psycopg2
 import mysql.connector
-from typing import List, Union
+from typing import Iterator, List, Optional, Tuple, Union
+import base64
+import json
 import logging
 logger = logging.getLogger(__name__)
 
-def get_database_connection(db_type: str, host: str, username: str, password: str, database_name: str) -> Union[pyodbc.Connection, psycopg2.extensions.connection, mysql.connector.MySQLConnection]:
+def get_database_connection(db_type: str, host: str, username: str, password: str, database_name: str,
+                            connect_timeout: Optional[int] = None) -> Union[pyodbc.Connection, psycopg2.extensions.connection, mysql.connector.MySQLConnection]:
+    """Open a connection; ``connect_timeout`` (seconds) bounds login when given."""
+    timeout_kwargs = {}
     try:
-        logger.debug(f"Attempting to connect: db_type={db_type}, host={host}, database={database_name}")
+        logger.debug("Attempting to connect: db_type=%s, host=%s, database=%s", db_type, host, database_name)
         if db_type.lower() == "sqlserver":
+            if connect_timeout is not None:
+                timeout_kwargs["timeout"] = connect_timeout  # pyodbc login timeout
             connection = pyodbc.connect(
                 f"DRIVER={{ODBC Driver 17 for SQL Server}};"
                 f"SERVER={host};"
                 f"DATABASE={database_name};"
                 f"UID={username};"
-                f"PWD={password}"
+                f"PWD={password}",
+                **timeout_kwargs
             )
         elif db_type.lower() == "postgres":
+            if connect_timeout is not None:
+                timeout_kwargs["connect_timeout"] = connect_timeout
             connection = psycopg2.connect(
                 dbname=database_name,
                 user=username,
                 password=password,
-                host=host
+                host=host,
+                **timeout_kwargs
             )
         elif db_type.lower() == "mysql":
+            if connect_timeout is not None:
+                timeout_kwargs["connection_timeout"] = connect_timeout
             connection = mysql.connector.connect(
                 user=username,
                 password=password,
                 host=host,
-                database=database_name
+                database=database_name,
+                **timeout_kwargs
             )
         else:
             raise ValueError("Unsupported database type. Choose 'sqlserver', 'postgres', or 'mysql'.")
         
-        print(f"Connected to {db_type} successfully!")
+        logger.debug("Connected to %s successfully", db_type)
         return connection
     
     except Exception as e:
-         logger.error(f"Error connecting to database: {e}", exc_info=True)
+         logger.error("Error connecting to database: %s", e, exc_info=True)
          raise 
 
 def get_databases(db_type: str, host: str, username: str, password: str) -> List[str]:
@@ -47,7 +61,7 @@ def get_databases(db_type: str, host: str, username: str, password: str) -> List
     cursor = None
     try:
         logger.info(
-            f"Fetching databases | db_type: {db_type}, host: {host}, user: {username}"
+            "Fetching databases | db_type: %s, host: %s, user: %s", db_type, host, username
         )
         
         # Connect to system database based on DB type
@@ -68,12 +82,12 @@ def get_databases(db_type: str, host: str, username: str, password: str) -> List
         cursor.execute(query)
         databases = [row[0] for row in cursor.fetchall()]
         
-        logger.info(f"Successfully fetched {len(databases)} databases")
+        logger.info("Successfully fetched %s databases", len(databases))
         return databases
         
     except Exception as e:
         logger.error(
-            f"Database fetch failed | db_type: {db_type}, host: {host}, error: {str(e)}",
+            "Database fetch failed | db_type: %s, host: %s, error: %s", db_type, host, e,
             exc_info=True
         )
         raise
@@ -90,7 +104,7 @@ def get_tables(db_type: str, host: str, username: str, password: str, database_n
     cursor = None
     try:
         logger.info(
-            f"Fetching tables | db_type: {db_type}, db: {database_name}, host: {host}"
+            "Fetching tables | db_type: %s, db: %s, host: %s", db_type, database_name, host
         )
         
         conn = get_database_connection(db_type, host, username, password, database_name)
@@ -111,12 +125,12 @@ def get_tables(db_type: str, host: str, username: str, password: str, database_n
         cursor.execute(query)
         tables = [row[0] for row in cursor.fetchall()]
         
-        logger.info(f"Found {len(tables)} tables in {database_name}")
+        logger.info("Found %s tables in %s", len(tables), database_name)
         return tables
         
     except Exception as e:
         logger.error(
-            f"Table fetch failed | db: {database_name}, error: {str(e)}",
+            "Table fetch failed | db: %s, error: %s", database_name, e,
             exc_info=True
         )
         raise
@@ -134,7 +148,7 @@ def get_table_schemas(db_type: str, host: str, username: str, password: str,
     cursor = None
     try:
         logger.info(
-            f"Fetching schema details | db: {database_name}, tables: {len(tables)}"
+            "Fetching schema details | db: %s, tables: %s", database_name, len(tables)
         )
         
         conn = get_database_connection(db_type, host, username, password, database_name)
@@ -142,7 +156,7 @@ def get_table_schemas(db_type: str, host: str, username: str, password: str,
         
         schemas = {}
         for table in tables:
-            logger.debug(f"Processing table: {table}")
+            logger.debug("Processing table: %s", table)
             if db_type == "sqlserver":
                 cursor.execute(f"""
                     SELECT column_name, data_type, is_nullable
@@ -171,12 +185,106 @@ def get_table_schemas(db_type: str, host: str, username: str, password: str,
                 for row in cursor.fetchall()
             ]
             
-        logger.info(f"Retrieved schemas for {len(schemas)} tables")
+        logger.info("Retrieved schemas for %s tables", len(schemas))
         return schemas
         
     except Exception as e:
         logger.error(
-            f"Schema fetch failed | db: {database_name}, error: {str(e)}",
+            "Schema fetch failed | db: %s, error: %s", database_name, e,
+            exc_info=True
+        )
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+            logger.debug("Schema connection closed")
+
+def get_databases_page(db_type: str, host: str, username: str, password: str,
+                       page_size: int = 500, prefix: Optional[str] = None,
+                       pattern: Optional[str] = None, page_token: Optional[str] = None) -> dict:
+    """Fetch one page of databases using keyset pagination pushed down to the catalog."""
+    system_db = "master" if db_type == "sqlserver" else "postgres"
+    return _fetch_catalog_page(
+        db_type, host, username, password, system_db, "databases",
+        page_size, prefix, pattern, page_token
+    )
+
+def get_tables_page(db_type: str, host: str, username: str, password: str, database_name: str,
+                    page_size: int = 500, prefix: Optional[str] = None,
+                    pattern: Optional[str] = None, page_token: Optional[str] = None) -> dict:
+    """Fetch one page of tables using keyset pagination pushed down to the catalog."""
+    return _fetch_catalog_page(
+        db_type, host, username, password, database_name, "tables",
+        page_size, prefix, pattern, page_token
+    )
+
+def stream_databases(db_type: str, host: str, username: str, password: str,
+                     prefix: Optional[str] = None, pattern: Optional[str] = None,
+                     batch_size: int = 1000) -> Iterator[str]:
+    """Yield database names from a server-side cursor without materializing the list."""
+    system_db = "master" if db_type == "sqlserver" else "postgres"
+    return _stream_catalog(
+        db_type, host, username, password, system_db, "databases", prefix, pattern, batch_size
+    )
+
+def stream_tables(db_type: str, host: str, username: str, password: str, database_name: str,
+                  prefix: Optional[str] = None, pattern: Optional[str] = None,
+                  batch_size: int = 1000) -> Iterator[str]:
+    """Yield table names from a server-side cursor without materializing the list."""
+    return _stream_catalog(
+        db_type, host, username, password, database_name, "tables", prefix, pattern, batch_size
+    )
+
+# Helper functions ------------------------------------------------------------
+
+def encode_page_token(last_key: Tuple[str, ...]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(last_key)).encode("utf-8")).decode("ascii")
+
+def decode_page_token(token: str, key_width: int) -> Tuple[str, ...]:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValueError("Invalid page token")
+    if not isinstance(key, list) or len(key) != key_width or not all(isinstance(k, str) for k in key):
+        raise ValueError("Invalid page token")
+    return tuple(key)
+
+def _fetch_catalog_page(db_type: str, host: str, username: str, password: str,
+                        connect_db: str, kind: str, page_size: int, prefix: Optional[str],
+                        pattern: Optional[str], page_token: Optional[str]) -> dict:
+    conn = None
+    cursor = None
+    try:
+        logger.info(
+            "Fetching %s page | db_type: %s, host: %s, db: %s, size: %s, prefix: %s, pattern: %s",
+            kind, db_type, host, connect_db, page_size, prefix, pattern
+        )
+        after = None
+        if page_token:
+            after = decode_page_token(page_token, len(_catalog_key_columns(db_type, kind)))
+        # One extra row tells us whether another page exists without a COUNT(*)
+        query, params = _build_catalog_query(db_type, kind, prefix, pattern, after, page_size + 1)
+
+        conn = get_database_connection(db_type, host, username, password, connect_db)
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = [tuple(row) for row in cursor.fetchmany(page_size + 1)]
+
+        next_token = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_token = encode_page_token(rows[-1])
+
+        # The name is always the last key column; leading ones only disambiguate paging
+        names = [row[-1] for row in rows]
+        logger.info("Fetched %s %s | more: %s", len(names), kind, next_token is not None)
+        return {kind: names, "next_page_token": next_token}
+
+    except Exception as e:
+        logger.error(
+            "Catalog page fetch failed | kind: %s, db: %s, error: %s", kind, connect_db, e,
             exc_info=True
         )
         raise
@@ -185,4 +293,152 @@ def get_table_schemas(db_type: str, host: str, username: str, password: str,
             cursor.close()
         if conn:
             conn.close()
-            logger.debug("Schema connection closed")
\ No newline at end of file
+            logger.debug("Catalog page connection closed")
+
+def _stream_catalog(db_type: str, host: str, username: str, password: str, connect_db: str,
+                    kind: str, prefix: Optional[str], pattern: Optional[str],
+                    batch_size: int) -> Iterator[str]:
+    """Connect and run the query now, so failures surface before the response starts."""
+    query, params = _build_catalog_query(db_type, kind, prefix, pattern, None, None)
+
+    logger.info("Streaming %s | db_type: %s, host: %s, db: %s", kind, db_type, host, connect_db)
+    conn = None
+    cursor = None
+    try:
+        conn = get_database_connection(db_type, host, username, password, connect_db)
+        cursor = _server_side_cursor(conn, db_type, batch_size)
+        cursor.execute(query, params)
+    except Exception as e:
+        logger.error(
+            "Catalog stream failed | kind: %s, db: %s, error: %s", kind, connect_db, e,
+            exc_info=True
+        )
+        _close_quietly(cursor, conn)
+        raise
+
+    def generate() -> Iterator[str]:
+        streamed = 0
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row[-1]
+                streamed += len(rows)
+            logger.info("Streamed %s %s from %s", streamed, kind, connect_db)
+        except Exception as e:
+            logger.error(
+                "Catalog stream failed | kind: %s, db: %s, error: %s", kind, connect_db, e,
+                exc_info=True
+            )
+            raise
+        finally:
+            # Runs on client disconnect too, with rows possibly still unread
+            _close_quietly(cursor, conn)
+            logger.debug("Catalog stream connection closed")
+
+    return generate()
+
+def _close_quietly(cursor, conn):
+    """Close cursor and connection independently; an unbuffered MySQL cursor with
+    unread rows raises on close, which must not leak the connection."""
+    if cursor:
+        try:
+            cursor.close()
+        except Exception as e:
+            logger.debug("Cursor close failed: %s", e)
+    if conn:
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug("Connection close failed: %s", e)
+
+def _server_side_cursor(conn, db_type: str, batch_size: int):
+    """Cursor that leaves the result set on the server and fetches it in batches."""
+    if db_type == "postgres":
+        # Named cursors are declared server-side; itersize bounds each round trip
+        cursor = conn.cursor(name="catalog_stream")
+        cursor.itersize = batch_size
+        return cursor
+    if db_type == "mysql":
+        return conn.cursor(buffered=False)
+    # pyodbc cursors already fetch lazily from the driver
+    return conn.cursor()
+
+def _catalog_key_columns(db_type: str, kind: str) -> Tuple[str, ...]:
+    """Columns that order the listing uniquely; the last one is the returned name.
+
+    SQL Server lists tables from every schema, so table_name alone is not unique
+    (dbo.orders vs sales.orders) and the schema has to be part of the keyset.
+    """
+    if db_type == "sqlserver":
+        return ("name",) if kind == "databases" else ("table_schema", "table_name")
+    if db_type == "postgres":
+        return ("datname",) if kind == "databases" else ("table_name",)
+    if db_type == "mysql":
+        return ("schema_name",) if kind == "databases" else ("table_name",)
+    raise ValueError(f"Unsupported database type: {db_type}")
+
+def _build_catalog_query(db_type: str, kind: str, prefix: Optional[str], pattern: Optional[str],
+                         after: Optional[Tuple[str, ...]], limit: Optional[int]) -> Tuple[str, tuple]:
+    """Catalog query ordered by its key with filters and keyset position pushed down."""
+    if db_type == "sqlserver":
+        if kind == "databases":
+            source = "sys.databases WHERE database_id > 4"
+        else:
+            source = "information_schema.tables WHERE table_type = 'BASE TABLE'"
+    elif db_type == "postgres":
+        if kind == "databases":
+            source = "pg_database WHERE datistemplate = false"
+        else:
+            source = "information_schema.tables WHERE table_schema = 'public'"
+    elif db_type == "mysql":
+        if kind == "databases":
+            source = "information_schema.schemata WHERE 1 = 1"
+        else:
+            source = "information_schema.tables WHERE table_schema = DATABASE()"
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+    key_columns = _catalog_key_columns(db_type, kind)
+    column = key_columns[-1]
+    placeholder = "?" if db_type == "sqlserver" else "%s"
+    conditions = []
+    params = []
+    if prefix:
+        conditions.append(f"{column} LIKE {placeholder} ESCAPE '!'")
+        params.append(_escape_like(db_type, prefix) + "%")
+    if pattern:
+        conditions.append(f"{column} LIKE {placeholder} ESCAPE '!'")
+        params.append(_glob_to_like(db_type, pattern))
+    if after is not None:
+        if len(key_columns) == 1:
+            conditions.append(f"{column} > {placeholder}")
+            params.append(after[0])
+        else:
+            leading = key_columns[0]
+            conditions.append(
+                f"({leading} > {placeholder} OR ({leading} = {placeholder} AND {column} > {placeholder}))"
+            )
+            params.extend([after[0], after[0], after[1]])
+
+    select = ", ".join(key_columns)
+    where = "".join(f" AND {condition}" for condition in conditions)
+    order = f" ORDER BY {select}"
+    if limit is None:
+        return f"SELECT {select} FROM {source}{where}{order}", tuple(params)
+    if db_type == "sqlserver":
+        return f"SELECT TOP ({int(limit)}) {select} FROM {source}{where}{order}", tuple(params)
+    return f"SELECT {select} FROM {source}{where}{order} LIMIT {int(limit)}", tuple(params)
+
+def _escape_like(db_type: str, value: str) -> str:
+    specials = "!%_[" if db_type == "sqlserver" else "!%_"
+    return "".join(f"!{ch}" if ch in specials else ch for ch in value)
+
+def _glob_to_like(db_type: str, pattern: str) -> str:
+    """Translate a shell-style pattern (``*``, ``?``) into an escaped LIKE pattern."""
+    return "".join(
+        "%" if ch == "*" else "_" if ch == "?" else _escape_like(db_type, ch)
+        for ch in pattern
+    )
@@ -1,16 +1,168 @@
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
-
-def configure_logging():
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s | %(levelname)-8s | %(name)-25s | %(message)s",
-        handlers=[
-            RotatingFileHandler(
-                "app.log",
-                maxBytes=10 * 1024 * 1024,  # 10 MB per log file
-                backupCount=5
-            ),
-            logging.StreamHandler()
-        ]
-    )
+import os
+import queue
+import re
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)-25s | %(message)s"
+
+# Attributes every LogRecord has; anything else was passed via ``extra`` and is emitted as a field
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_SECRET_KEY_PATTERN = re.compile(r"password|passwd|pwd|secret|token|api_key", re.IGNORECASE)
+# key=value / "key": "value" pairs and ODBC-style PWD=...; segments carrying credentials
+_SECRET_PATTERN = re.compile(
+    r"""(?P<key>["']?(?:password|passwd|pwd|secret|token|api_key)["']?\s*[:=]\s*)"""
+    r"""(?P<value>"[^"]*"|'[^']*'|[^\s,;}]+)""",
+    re.IGNORECASE
+)
+
+_listener: Optional[QueueListener] = None
+
+
+def redact(value):
+    """Mask credentials in a string, or in every key/value of a nested dict/list."""
+    if isinstance(value, str):
+        return _SECRET_PATTERN.sub(lambda m: m.group("key") + "***", value)
+    if isinstance(value, dict):
+        return {
+            key: "***" if _SECRET_KEY_PATTERN.search(str(key)) else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple, set)):
+        return [redact(item) for item in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return redact(str(value))
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra`` fields, with credentials masked."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(redact(payload))
+
+
+class RedactingFormatter(logging.Formatter):
+    """Plain-text formatter that masks credentials in the full line, traceback included."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return redact(super().format(record))
+
+
+class SamplingFilter(logging.Filter):
+    """Cap hot low-level call sites at ``max_per_second`` records each.
+
+    Counting is deliberately lock-free: a race can let a record or two extra through,
+    which is cheaper than contending on a lock in the request path.
+    """
+
+    def __init__(self, max_per_second: int = 20, level: int = logging.DEBUG):
+        super().__init__()
+        self.max_per_second = max_per_second
+        self.level = level
+        self._windows = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.level:
+            return True
+        key = (record.pathname, record.lineno)
+        second = int(time.monotonic())
+        window, count = self._windows.get(key, (second, 0))
+        if window != second:
+            window, count = second, 0
+        self._windows[key] = (window, count + 1)
+        return count < self.max_per_second
+
+
+class _SnapshotQueueHandler(QueueHandler):
+    """Render the message on the caller's thread, but defer everything else.
+
+    Interpolating now pins the log line to the state the request actually had;
+    the listener would otherwise see later mutations of ``record.args``. Unlike the
+    stock ``prepare`` this keeps ``exc_info`` intact (the queue is in-process), so
+    traceback formatting, JSON encoding and redaction still happen on the listener.
+    Records dropped by level or sampling never reach this point.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(level: Optional[str] = None, log_file: Optional[str] = None,
+                      json_logs: Optional[bool] = None,
+                      debug_rate_limit: Optional[int] = None) -> QueueListener:
+    """Route all logging through an in-memory queue drained by a background listener.
+
+    Request threads only pay for message interpolation and the enqueue; file and
+    console I/O, JSON/traceback formatting and redaction happen on the listener
+    thread. Defaults come from LOG_LEVEL, LOG_FILE, LOG_JSON and LOG_DEBUG_RATE_LIMIT
+    (records per second per DEBUG call site; 0 disables sampling).
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    log_file = log_file or os.getenv("LOG_FILE", "app.log")
+    if json_logs is None:
+        json_logs = os.getenv("LOG_JSON", "1") != "0"
+    if debug_rate_limit is None:
+        debug_rate_limit = int(os.getenv("LOG_DEBUG_RATE_LIMIT", "20"))
+
+    formatter = JsonFormatter() if json_logs else RedactingFormatter(TEXT_FORMAT)
+    handlers = [
+        RotatingFileHandler(
+            log_file,
+            maxBytes=10 * 1024 * 1024,  # 10 MB per log file
+            backupCount=5
+        ),
+        logging.StreamHandler()
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+    queue_handler = _SnapshotQueueHandler(log_queue)
+    if debug_rate_limit > 0:
+        queue_handler.addFilter(SamplingFilter(max_per_second=debug_rate_limit))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
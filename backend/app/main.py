@@ -1,10 +1,15 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from brotli_asgi import BrotliMiddleware
 from app.routers import database_router
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.routers import chat_history
+from app.logging_config import configure_logging, stop_logging
 
-app = FastAPI(title="Schema Verification Tool")
+configure_logging()
+
+app = FastAPI(title="Schema Verification Tool", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,12 +17,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Brotli for clients that accept it, gzip otherwise; small bodies aren't worth the CPU
+app.add_middleware(BrotliMiddleware, minimum_size=1024, gzip_fallback=True)
+
 
 app.include_router(database_router.router)
 app.include_router(chat_history.router)
 
+@app.on_event("shutdown")
+def flush_logs():
+    stop_logging()
+
 @app.get("/")
 def read_root():
     return {"message": "Schema Verification Tool is running!"}
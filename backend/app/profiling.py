@@ -0,0 +1,344 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+import logging
+
+from app.database import get_database_connection
+
+logger = logging.getLogger(__name__)
+
+# Rows we aim to read per table; anything larger is sampled down to roughly this size
+SAMPLE_TARGET_ROWS = 10_000
+# Wall-clock budget per table, covering connect and every statement
+TABLE_TIME_BUDGET_SECONDS = 5
+# Cap on how long schema analysis waits for profiles before prompting without the rest
+ANALYSIS_PROFILE_BUDGET_SECONDS = 10
+MAX_PROFILE_WORKERS = 8
+PROFILE_CACHE_TTL_SECONDS = 60 * 60
+PROFILE_CACHE_MAX_ENTRIES = 2048
+
+# Types the engines refuse to MIN/MAX/COUNT(DISTINCT) on, or that are too wide to be useful
+_UNPROFILABLE_TYPES = {
+    "sqlserver": {"text", "ntext", "image", "xml", "bit", "geography", "geometry",
+                  "hierarchyid", "sql_variant", "varbinary", "binary", "timestamp"},
+    "postgres": {"json", "jsonb", "xml", "bytea", "boolean", "array", "user-defined",
+                 "point", "line", "lseg", "box", "path", "polygon", "circle", "tsvector"},
+    "mysql": {"json", "blob", "tinyblob", "mediumblob", "longblob", "geometry", "point",
+              "linestring", "polygon", "binary", "varbinary"},
+}
+
+# Types that support COUNT(DISTINCT) but have no MIN/MAX
+_NO_RANGE_TYPES = {
+    "sqlserver": {"uniqueidentifier"},
+    "postgres": {"uuid"},
+    "mysql": set(),
+}
+
+_profile_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def profile_tables(db_type: str, host: str, username: str, password: str,
+                   database_name: str, schemas: Dict[str, List[dict]],
+                   deadline_seconds: Optional[float] = None) -> Dict[str, dict]:
+    """Collect sampled column statistics for the given tables, in parallel.
+
+    ``schemas`` is the output of ``get_table_schemas``. Each table gets
+    TABLE_TIME_BUDGET_SECONDS of wall clock for connect and queries; tables that
+    fail or run out are left out of the result rather than failing the whole
+    profile. With ``deadline_seconds`` the call returns whatever has finished by
+    then; tables still running are cached when they complete and queued ones are
+    dropped. Blocks, so call it from a worker thread, not the event loop.
+    """
+    cache_key = (db_type, host, username, database_name)
+    profiles = {}
+    pending = {}
+    for table, columns in schemas.items():
+        cached = _get_cached_profile(cache_key, table, columns)
+        if cached is not None:
+            profiles[table] = cached
+        else:
+            pending[table] = columns
+
+    logger.info(
+        "Profiling tables | db: %s, cached: %s, pending: %s",
+        database_name, len(profiles), len(pending)
+    )
+    if not pending:
+        return profiles
+
+    executor = ThreadPoolExecutor(max_workers=min(MAX_PROFILE_WORKERS, len(pending)))
+    futures = {}
+    try:
+        for table, columns in pending.items():
+            future = executor.submit(
+                _profile_table, db_type, host, username, password, database_name, table, columns
+            )
+            # Cache from the worker so results that land after the deadline are kept
+            future.add_done_callback(
+                lambda f, table=table, columns=columns: _cache_result(cache_key, table, columns, f)
+            )
+            futures[future] = table
+
+        done, not_done = wait(futures, timeout=deadline_seconds)
+        for future in done:
+            if future.exception() is None:
+                profiles[futures[future]] = future.result()
+        if not_done:
+            logger.warning(
+                "Profiling deadline reached | db: %s, finished: %s, unfinished: %s",
+                database_name, len(done), len(not_done)
+            )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return profiles
+
+
+def format_profile_for_prompt(profiles: Dict[str, dict]) -> str:
+    """Render profiles as compact text for the LLM prompt."""
+    lines = []
+    for table, profile in profiles.items():
+        lines.append(f"{table} (~{profile['row_estimate']} rows, sampled {profile['sampled_rows']})")
+        for name, stats in profile["columns"].items():
+            parts = [f"nulls={stats['null_fraction']:.0%}"]
+            if stats.get("approx_distinct") is not None:
+                parts.append(f"distinct~{stats['approx_distinct']}")
+            if stats.get("min") is not None:
+                parts.append(f"range=[{stats['min']} .. {stats['max']}]")
+            lines.append(f"  - {name}: {', '.join(parts)}")
+    return "\n".join(lines)
+
+
+def clear_profile_cache():
+    with _cache_lock:
+        _profile_cache.clear()
+
+
+# Helper functions ------------------------------------------------------------
+
+def _profile_table(db_type: str, host: str, username: str, password: str,
+                   database_name: str, table: str, columns: List[dict]) -> dict:
+    """Profile one table on its own connection (DB-API connections are not thread-safe).
+
+    Connect and both statements share one TABLE_TIME_BUDGET_SECONDS deadline; each
+    statement's server-side timeout is whatever is left of it.
+    """
+    started = time.perf_counter()
+    deadline = started + TABLE_TIME_BUDGET_SECONDS
+    conn = None
+    cursor = None
+    try:
+        conn = get_database_connection(
+            db_type, host, username, password, database_name,
+            connect_timeout=TABLE_TIME_BUDGET_SECONDS
+        )
+        _apply_time_budget(conn, db_type, _remaining(deadline, table))
+        cursor = conn.cursor()
+
+        row_estimate = _estimate_row_count(cursor, db_type, table)
+        profiled = [c for c in columns if not _is_unprofilable(db_type, c["type"])]
+        ranged = [c for c in profiled if _has_range(db_type, c["type"])]
+
+        _apply_time_budget(conn, db_type, _remaining(deadline, table))
+        cursor.execute(_build_profile_query(db_type, table, columns, profiled, ranged, row_estimate))
+        row = cursor.fetchone()
+
+        sampled_rows = row[0] or 0
+        if row_estimate is None:
+            row_estimate = sampled_rows
+
+        stats = {}
+        offset = 1
+        for column in columns:
+            non_null = row[offset] or 0
+            offset += 1
+            column_stats = {
+                "null_fraction": 1 - non_null / sampled_rows if sampled_rows else 0.0,
+                "approx_distinct": None,
+                "min": None,
+                "max": None,
+            }
+            if column in profiled:
+                distinct = row[offset]
+                offset += 1
+                column_stats["approx_distinct"] = _scale_distinct(
+                    distinct or 0, non_null, sampled_rows, row_estimate
+                )
+            if column in ranged:
+                min_value, max_value = row[offset:offset + 2]
+                offset += 2
+                column_stats["min"] = None if min_value is None else str(min_value)
+                column_stats["max"] = None if max_value is None else str(max_value)
+            stats[column["name"]] = column_stats
+
+        logger.debug(
+            "Profiled %s | rows~%s, sampled: %s, elapsed: %.2fs",
+            table, row_estimate, sampled_rows, time.perf_counter() - started
+        )
+        return {"row_estimate": row_estimate, "sampled_rows": sampled_rows, "columns": stats}
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+def _remaining(deadline: float, table: str) -> float:
+    remaining = deadline - time.perf_counter()
+    if remaining <= 0:
+        raise TimeoutError(f"Profiling budget exhausted for {table}")
+    return remaining
+
+
+def _apply_time_budget(conn, db_type: str, seconds: float):
+    """Have the server abort the next profiling statement after ``seconds``."""
+    budget_ms = max(1, int(seconds * 1000))
+    if db_type == "sqlserver":
+        # pyodbc query timeout is whole seconds and 0 means "no timeout"
+        conn.timeout = max(1, math.ceil(seconds))
+        return
+    cursor = conn.cursor()
+    try:
+        if db_type == "postgres":
+            cursor.execute(f"SET statement_timeout = {budget_ms}")
+        elif db_type == "mysql":
+            cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {budget_ms}")
+    finally:
+        cursor.close()
+
+
+def _estimate_row_count(cursor, db_type: str, table: str) -> Optional[int]:
+    """Read the planner's row estimate from catalog statistics instead of counting."""
+    if db_type == "sqlserver":
+        cursor.execute(
+            "SELECT SUM(row_count) FROM sys.dm_db_partition_stats "
+            "WHERE object_id = OBJECT_ID(?) AND index_id IN (0, 1)",
+            (_quote_identifier(db_type, table),)
+        )
+    elif db_type == "postgres":
+        cursor.execute(
+            "SELECT c.reltuples::bigint FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = 'public' AND c.relname = %s",
+            (table,)
+        )
+    elif db_type == "mysql":
+        cursor.execute(
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s",
+            (table,)
+        )
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+    row = cursor.fetchone()
+    # Never-analyzed tables report -1 (Postgres 14+) or 0 (older, and partitioned
+    # parents); treat both as unknown so the LIMIT fallback avoids a full scan
+    if not row or row[0] is None or row[0] <= 0:
+        return None
+    return int(row[0])
+
+
+def _build_profile_query(db_type: str, table: str, columns: List[dict], profiled: List[dict],
+                         ranged: List[dict], row_estimate: Optional[int]) -> str:
+    aggregates = ["COUNT(*)"]
+    for column in columns:
+        name = _quote_identifier(db_type, column["name"])
+        aggregates.append(f"COUNT({name})")
+        if column in profiled:
+            aggregates.append(f"COUNT(DISTINCT {name})")
+        if column in ranged:
+            aggregates.extend([f"MIN({name})", f"MAX({name})"])
+
+    return f"SELECT {', '.join(aggregates)} FROM {_sample_source(db_type, table, row_estimate)}"
+
+
+def _sample_source(db_type: str, table: str, row_estimate: Optional[int]) -> str:
+    """FROM clause reading roughly SAMPLE_TARGET_ROWS rows using the dialect's native sampling."""
+    quoted = _quote_identifier(db_type, table)
+    if row_estimate is not None and row_estimate <= SAMPLE_TARGET_ROWS:
+        return quoted
+
+    if row_estimate is not None and db_type in ("sqlserver", "postgres"):
+        percent = max(SAMPLE_TARGET_ROWS * 100 / row_estimate, 0.01)
+        if db_type == "sqlserver":
+            return f"{quoted} TABLESAMPLE ({percent:.4f} PERCENT)"
+        return f"{quoted} TABLESAMPLE SYSTEM ({percent:.4f})"
+
+    # MySQL has no TABLESAMPLE, and without an estimate we cannot pick a percentage
+    if db_type == "sqlserver":
+        return f"(SELECT TOP ({SAMPLE_TARGET_ROWS}) * FROM {quoted}) AS sample"
+    return f"(SELECT * FROM {quoted} LIMIT {SAMPLE_TARGET_ROWS}) AS sample"
+
+
+def _scale_distinct(distinct: int, non_null: int, sampled_rows: int, row_estimate: int) -> int:
+    """Extrapolate a sampled distinct count; near-unique columns scale with the table."""
+    if not sampled_rows or sampled_rows >= row_estimate:
+        return distinct
+    if non_null and distinct / non_null > 0.95:
+        return int(distinct * row_estimate / sampled_rows)
+    return distinct
+
+
+def _is_unprofilable(db_type: str, data_type: str) -> bool:
+    return data_type.lower() in _UNPROFILABLE_TYPES.get(db_type, set())
+
+
+def _has_range(db_type: str, data_type: str) -> bool:
+    return data_type.lower() not in _NO_RANGE_TYPES.get(db_type, set())
+
+
+def _quote_identifier(db_type: str, name: str) -> str:
+    if db_type == "sqlserver":
+        return "[" + name.replace("]", "]]") + "]"
+    if db_type == "mysql":
+        return "`" + name.replace("`", "``") + "`"
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _cache_result(cache_key: tuple, table: str, columns: List[dict], future):
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        logger.warning("Profiling failed | table: %s, error: %s", table, error)
+        return
+    _set_cached_profile(cache_key, table, columns, future.result())
+
+
+def _columns_fingerprint(columns: List[dict]) -> str:
+    """Changes whenever columns are added, dropped, renamed or retyped."""
+    signature = "|".join(f"{column['name']}:{column['type']}" for column in columns)
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()
+
+
+def _get_cached_profile(cache_key: tuple, table: str, columns: List[dict]) -> Optional[dict]:
+    """Keyed by connecting user too: profiles hold real values the next user may not be allowed to see.
+
+    The column fingerprint makes an ALTER TABLE miss the cache instead of serving stale columns.
+    """
+    key = (*cache_key, table, _columns_fingerprint(columns))
+    with _cache_lock:
+        entry = _profile_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, profile = entry
+        if time.monotonic() - stored_at > PROFILE_CACHE_TTL_SECONDS:
+            del _profile_cache[key]
+            return None
+        _profile_cache.move_to_end(key)
+        return profile
+
+
+def _set_cached_profile(cache_key: tuple, table: str, columns: List[dict], profile: dict):
+    key = (*cache_key, table, _columns_fingerprint(columns))
+    with _cache_lock:
+        _profile_cache[key] = (time.monotonic(), profile)
+        _profile_cache.move_to_end(key)
+        while len(_profile_cache) > PROFILE_CACHE_MAX_ENTRIES:
+            _profile_cache.popitem(last=False)
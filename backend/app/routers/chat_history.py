@@ -1,11 +1,12 @@
 # routers/chat_history.py
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query, Response, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional, Dict
 from collections import defaultdict
 from app.utils.vector_db import delete_conversation_by_id, get_chroma_client
-from app.schemas import ConversationItem, MessageItem
+from app.utils.http_cache import etag_json_response
+from app.schemas import ConversationItem
 import logging
 import re
 
@@ -17,12 +18,17 @@ CONVERSATION_ID_PATTERN = re.compile(r"^conv_[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}
 
 @router.get("", response_model=List[ConversationItem])
 async def get_chat_history(
+    request: Request,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
     database: Optional[str] = None,
     table: Optional[str] = None
 ):
-    """Retrieve paginated conversations with filters"""
+    """Retrieve paginated conversations with filters.
+
+    Items are plain dicts shaped like ConversationItem; building models for every
+    message only to serialize them again is the bulk of the cost on long histories.
+    """
     try:
         client = get_chroma_client()
         collection = client.get_collection("chat_history")
@@ -52,12 +58,7 @@ async def get_chat_history(
                 continue
                 
             conversations[conv_id].append(
-                MessageItem(
-                    id=result["ids"][i],
-                    prompt=result["documents"][i],
-                    response=result["documents"][i+1] if i % 2 == 0 else "",  # Pair logic
-                    timestamp=metadata.get("timestamp", "")
-                )
+                _message_item(result, i, metadata)
             )
         
         # Build response
@@ -67,28 +68,23 @@ async def get_chat_history(
                 continue
                 
             # Get metadata from first message
-            first_metadata = result["metadatas"][result["ids"].index(messages[0].id)]
+            first_metadata = result["metadatas"][result["ids"].index(messages[0]["id"])]
             conv_items.append(
-                ConversationItem(
-                    id=conv_id,
-                    database=first_metadata.get("database", "unknown"),
-                    tables=_parse_tables(first_metadata.get("tables", [])),
-                    messages=messages,
-                    last_updated=max(msg.timestamp for msg in messages)
-                )
+                _conversation_item(conv_id, first_metadata, messages)
             )
         
-        return sorted(conv_items, key=lambda x: x.last_updated, reverse=True)[:limit]
+        conv_items = sorted(conv_items, key=lambda x: x["last_updated"], reverse=True)[:limit]
+        return etag_json_response(request, conv_items)
 
     except Exception as e:
-        logger.error(f"History retrieval failed: {str(e)}", exc_info=True)
-        return JSONResponse(
+        logger.error("History retrieval failed: %s", e, exc_info=True)
+        return ORJSONResponse(
             status_code=500,
             content={"detail": "Failed to retrieve chat history"}
         )
 
 @router.get("/{conversation_id}", response_model=ConversationItem)
-async def get_conversation(conversation_id: str):
+async def get_conversation(conversation_id: str, request: Request):
     """Get entire conversation by conversation_id"""
     try:
         if not CONVERSATION_ID_PATTERN.match(conversation_id):
@@ -107,28 +103,18 @@ async def get_conversation(conversation_id: str):
             raise HTTPException(404, "Conversation not found")
             
         messages = [
-            MessageItem(
-                id=result["ids"][i],
-                prompt=result["documents"][i],
-                response=result["documents"][i+1] if i % 2 == 0 else "",
-                timestamp=result["metadatas"][i].get("timestamp", "")
-            )
+            _message_item(result, i, result["metadatas"][i])
             for i in range(len(result["ids"]))
         ]
         
-        first_metadata = result["metadatas"][0]
-        return ConversationItem(
-            id=conversation_id,
-            database=first_metadata.get("database", "unknown"),
-            tables=_parse_tables(first_metadata.get("tables", [])),
-            messages=messages,
-            last_updated=max(msg.timestamp for msg in messages)
+        return etag_json_response(
+            request, _conversation_item(conversation_id, result["metadatas"][0], messages)
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to fetch conversation: {str(e)}")
+        logger.error("Failed to fetch conversation: %s", e)
         raise HTTPException(500, "Failed to retrieve conversation")
 
 @router.delete("/{conversation_id}", status_code=204)
@@ -143,7 +129,7 @@ async def delete_conversation(conversation_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Deletion failed: {str(e)}")
+        logger.error("Deletion failed: %s", e)
         raise HTTPException(500, "Conversation deletion failed")
 
 
@@ -163,6 +149,27 @@ def _build_where_clause(database: Optional[str], table: Optional[str]) -> Option
     return {"$and": filters} if len(filters) > 1 else filters[0]
 
 
+def _message_item(result: Dict, i: int, metadata: Dict) -> Dict:
+    """MessageItem-shaped dict built straight from trusted ChromaDB output."""
+    return {
+        "id": result["ids"][i],
+        "prompt": result["documents"][i],
+        "response": result["documents"][i+1] if i % 2 == 0 else "",  # Pair logic
+        "timestamp": metadata.get("timestamp", "")
+    }
+
+
+def _conversation_item(conv_id: str, first_metadata: Dict, messages: List[Dict]) -> Dict:
+    """ConversationItem-shaped dict; metadata comes from the conversation's first message."""
+    return {
+        "id": conv_id,
+        "database": first_metadata.get("database", "unknown"),
+        "tables": _parse_tables(first_metadata.get("tables", [])),
+        "messages": messages,
+        "last_updated": max(msg["timestamp"] for msg in messages)
+    }
+
+
 def _parse_tables(tables) -> List[str]:
     if isinstance(tables, str):
         return [t.strip() for t in tables.split(",") if t.strip()]
@@ -1,17 +1,28 @@
-from fastapi import APIRouter, HTTPException, status
-from app.database import get_database_connection, get_databases, get_tables, get_table_schemas
-from app.schemas import DBConnectionRequest, AnalyzeSchemaRequest
+from typing import Iterator, Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from app.database import (
+    get_database_connection, get_databases, get_tables, get_table_schemas,
+    get_databases_page, get_tables_page, stream_databases, stream_tables
+)
+from app.profiling import profile_tables, format_profile_for_prompt, ANALYSIS_PROFILE_BUDGET_SECONDS
+from app.schemas import DBConnectionRequest, AnalyzeSchemaRequest, ProfileTablesRequest, SimilarTablesRequest
 from app.utils.llm_integration import analyze_schema
+from app.utils.model_router import get_routing_stats
+from app.utils.schema_index import index_table_schemas, prune_missing_tables, find_similar_tables
+import json
 import logging
 
 logger = logging.getLogger("schema_verification.database_router")
 
 router = APIRouter(prefix="/database", tags=["Database"])
 
+SCHEMA_INDEX_CHUNK_SIZE = 500
+
 @router.post("/connect", status_code=status.HTTP_200_OK)
 async def connect_to_database(request: DBConnectionRequest):
     """Test database connection."""
-    logger.info(f"Received connection request for {request.db_type}@{request.host}, db: {request.database_name}")
+    logger.info("Received connection request for %s@%s, db: %s", request.db_type, request.host, request.database_name)
     try:
         connection = get_database_connection(
             request.db_type,
@@ -21,10 +32,10 @@ async def connect_to_database(request: DBConnectionRequest):
             request.database_name
         )
         connection.close()
-        logger.info(f"Successfully connected to {request.db_type}@{request.host}, db: {request.database_name}")
+        logger.info("Successfully connected to %s@%s, db: %s", request.db_type, request.host, request.database_name)
         return {"message": f"Connected to {request.db_type} database!"}
     except Exception as e:
-        logger.error(f"Failed to connect to {request.db_type}@{request.host}, db: {request.database_name}: {e}", exc_info=True)
+        logger.error("Failed to connect to %s@%s, db: %s: %s", request.db_type, request.host, request.database_name, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Database connection failed. Please check your credentials and connection details."
@@ -33,7 +44,7 @@ async def connect_to_database(request: DBConnectionRequest):
 @router.post("/databases/", status_code=status.HTTP_200_OK)
 async def list_databases(request: DBConnectionRequest):
     """Fetch all databases under the connected server."""
-    logger.info(f"Listing databases for {request.db_type}@{request.host}")
+    logger.info("Listing databases for %s@%s", request.db_type, request.host)
     try:
         databases = get_databases(
             request.db_type,
@@ -41,10 +52,10 @@ async def list_databases(request: DBConnectionRequest):
             request.username,
             request.password
         )
-        logger.debug(f"Found {len(databases)} databases")
+        logger.debug("Found %s databases", len(databases))
         return {"databases": databases}
     except Exception as e:
-        logger.error(f"Database listing failed: {str(e)}", exc_info=True)
+        logger.error("Database listing failed: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database listing service unavailable"
@@ -53,7 +64,7 @@ async def list_databases(request: DBConnectionRequest):
 @router.post("/tables/{database_name}", status_code=status.HTTP_200_OK)
 async def list_tables(database_name: str, request: DBConnectionRequest):
     """Fetch tables in a selected database."""
-    logger.info(f"Listing tables in {database_name}")
+    logger.info("Listing tables in %s", database_name)
     try:
         tables = get_tables(
             request.db_type,
@@ -62,19 +73,180 @@ async def list_tables(database_name: str, request: DBConnectionRequest):
             request.password,
             database_name
         )
-        logger.debug(f"Found {len(tables)} tables in {database_name}")
+        logger.debug("Found %s tables in %s", len(tables), database_name)
         return {"tables": tables}
     except Exception as e:
-        logger.error(f"Table listing failed: {str(e)} | DB: {database_name}", exc_info=True)
+        logger.error("Table listing failed: %s | DB: %s", e, database_name, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Invalid database or insufficient privileges"
         )
 
+@router.post("/databases/page", status_code=status.HTTP_200_OK)
+def list_databases_page(
+    request: DBConnectionRequest,
+    page_size: int = Query(500, ge=1, le=5000),
+    prefix: Optional[str] = None,
+    pattern: Optional[str] = None,
+    page_token: Optional[str] = None
+):
+    """Fetch one page of databases; pass back next_page_token to continue.
+
+    Plain ``def`` so the blocking catalog query runs in FastAPI's threadpool.
+    """
+    logger.info("Listing databases page for %s@%s", request.db_type, request.host)
+    try:
+        return get_databases_page(
+            request.db_type,
+            request.host,
+            request.username,
+            request.password,
+            page_size=page_size,
+            prefix=prefix,
+            pattern=pattern,
+            page_token=page_token
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error("Database page listing failed: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database listing service unavailable"
+        )
+
+@router.post("/databases/stream", status_code=status.HTTP_200_OK)
+def stream_databases_endpoint(
+    request: DBConnectionRequest,
+    prefix: Optional[str] = None,
+    pattern: Optional[str] = None
+):
+    """Stream database names as newline-delimited JSON.
+
+    The connection is opened before the response starts, so connection errors
+    still map to an error status instead of an empty 200 body.
+    """
+    logger.info("Streaming databases for %s@%s", request.db_type, request.host)
+    try:
+        names = stream_databases(
+            request.db_type,
+            request.host,
+            request.username,
+            request.password,
+            prefix=prefix,
+            pattern=pattern
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error("Database streaming failed: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database listing service unavailable"
+        )
+    return StreamingResponse(_ndjson(names), media_type="application/x-ndjson")
+
+@router.post("/tables/{database_name}/page", status_code=status.HTTP_200_OK)
+def list_tables_page(
+    database_name: str,
+    request: DBConnectionRequest,
+    page_size: int = Query(500, ge=1, le=5000),
+    prefix: Optional[str] = None,
+    pattern: Optional[str] = None,
+    page_token: Optional[str] = None
+):
+    """Fetch one page of tables; pass back next_page_token to continue (runs in the threadpool)."""
+    logger.info("Listing tables page in %s", database_name)
+    try:
+        return get_tables_page(
+            request.db_type,
+            request.host,
+            request.username,
+            request.password,
+            database_name,
+            page_size=page_size,
+            prefix=prefix,
+            pattern=pattern,
+            page_token=page_token
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error("Table page listing failed: %s | DB: %s", e, database_name, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid database or insufficient privileges"
+        )
+
+@router.post("/tables/{database_name}/stream", status_code=status.HTTP_200_OK)
+def stream_tables_endpoint(
+    database_name: str,
+    request: DBConnectionRequest,
+    prefix: Optional[str] = None,
+    pattern: Optional[str] = None
+):
+    """Stream table names as newline-delimited JSON (connects before the response starts)."""
+    logger.info("Streaming tables in %s", database_name)
+    try:
+        names = stream_tables(
+            request.db_type,
+            request.host,
+            request.username,
+            request.password,
+            database_name,
+            prefix=prefix,
+            pattern=pattern
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error("Table streaming failed: %s | DB: %s", e, database_name, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid database or insufficient privileges"
+        )
+    return StreamingResponse(_ndjson(names), media_type="application/x-ndjson")
+
+@router.post("/profile/", status_code=status.HTTP_200_OK)
+def profile_tables_endpoint(request: ProfileTablesRequest):
+    """Sampled column statistics (row estimate, null fraction, distinct count, min/max).
+
+    Plain ``def`` so FastAPI runs the blocking profiling in its threadpool.
+    """
+    logger.info("Profiling %s tables in %s", len(request.selected_tables), request.database_name)
+    try:
+        schema_info = get_table_schemas(
+            request.db_type,
+            request.host,
+            request.username,
+            request.password,
+            request.database_name,
+            request.selected_tables
+        )
+        profiles = profile_tables(
+            request.db_type,
+            request.host,
+            request.username,
+            request.password,
+            request.database_name,
+            schema_info
+        )
+        return {"profiles": profiles}
+    except Exception as e:
+        logger.error("Profiling failed: %s | DB: %s", e, request.database_name, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Table profiling failed. Please validate inputs and try again."
+        )
+
 @router.post("/analyze-schema/", status_code=status.HTTP_201_CREATED)
-async def analyze_schema_endpoint(request: AnalyzeSchemaRequest):
-    """Enterprise-grade schema analysis endpoint."""
-    logger.info(f"Schema analysis started for {request.database_name} (tables: {request.selected_tables})")
+def analyze_schema_endpoint(request: AnalyzeSchemaRequest):
+    """Enterprise-grade schema analysis endpoint.
+
+    Plain ``def`` so introspection, profiling and the LLM call run in FastAPI's
+    threadpool instead of blocking the event loop.
+    """
+    logger.info("Schema analysis started for %s (tables: %s)", request.database_name, request.selected_tables)
     try:
         # Fetch detailed schema info for selected tables
         schema_info = get_table_schemas(
@@ -85,17 +257,135 @@ async def analyze_schema_endpoint(request: AnalyzeSchemaRequest):
             request.database_name,
             request.selected_tables
         )
+        _index_schemas(request, schema_info)
+        profile = ""
+        if request.include_profile:
+            profile = _profile_for_prompt(request, schema_info)
         result = analyze_schema(
             prompt=request.prompt,
             schema_info=schema_info,
             selected_tables=request.selected_tables,
-            database_name=request.database_name
+            database_name=request.database_name,
+            profile=profile
         )
-        logger.info(f"Analysis completed for {request.database_name}")
+        logger.info("Analysis completed for %s", request.database_name)
         return result
     except Exception as e:
-        logger.error(f"Analysis failed: {str(e)} | Input: {request.model_dump()}", exc_info=True)
+        # Never log the raw request: it carries the connection password
+        logger.error(
+            "Analysis failed: %s | Input: %s",
+            e, request.model_dump(exclude={"password"}), exc_info=True
+        )
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Schema analysis failed. Please validate inputs and try again."
         )
+
+@router.get("/llm-routing/stats", status_code=status.HTTP_200_OK)
+async def llm_routing_stats():
+    """Per-route call counts and latency plus recent routing decisions."""
+    return get_routing_stats()
+
+@router.post("/schema-index/{database_name}", status_code=status.HTTP_200_OK)
+def refresh_schema_index(database_name: str, request: DBConnectionRequest):
+    """Index every table in a database for similarity search; unchanged tables are skipped.
+
+    Plain ``def`` so the long introspection and embedding run in FastAPI's threadpool.
+    """
+    logger.info("Refreshing schema index for %s@%s/%s", request.db_type, request.host, database_name)
+    try:
+        totals = {"indexed": 0, "unchanged": 0}
+        seen_tables = set()
+        page_token = None
+        # Walk the catalog a page at a time so neither names nor schemas are loaded all at once
+        while True:
+            page = get_tables_page(
+                request.db_type,
+                request.host,
+                request.username,
+                request.password,
+                database_name,
+                page_size=SCHEMA_INDEX_CHUNK_SIZE,
+                page_token=page_token
+            )
+            tables = [table for table in page["tables"] if table not in seen_tables]
+            seen_tables.update(tables)
+            if tables:
+                schema_info = get_table_schemas(
+                    request.db_type,
+                    request.host,
+                    request.username,
+                    request.password,
+                    database_name,
+                    tables
+                )
+                counts = index_table_schemas(request.db_type, request.host, database_name, schema_info)
+                totals["indexed"] += counts["indexed"]
+                totals["unchanged"] += counts["unchanged"]
+            page_token = page["next_page_token"]
+            if not page_token:
+                break
+        totals["pruned"] = prune_missing_tables(request.host, database_name, seen_tables)
+        return totals
+    except Exception as e:
+        logger.error("Schema index refresh failed: %s | DB: %s", e, database_name, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Schema index refresh failed. Please validate inputs and try again."
+        )
+
+@router.post("/similar-tables/", status_code=status.HTTP_200_OK)
+async def similar_tables(request: SimilarTablesRequest):
+    """Top-k tables across indexed servers whose schema resembles the given table."""
+    logger.info("Similar tables lookup for %s/%s (k=%s)", request.database_name, request.table, request.k)
+    try:
+        matches = find_similar_tables(
+            request.host,
+            request.database_name,
+            request.table,
+            k=request.k,
+            exclude_same_database=request.exclude_same_database
+        )
+    except Exception as e:
+        logger.error("Similar tables lookup failed: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Schema similarity service unavailable"
+        )
+    if matches is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Table is not indexed yet. Refresh the schema index for its database first."
+        )
+    return {"matches": matches}
+
+
+def _profile_for_prompt(request: AnalyzeSchemaRequest, schema_info: dict) -> str:
+    """Profiling only enriches the prompt, so a failure here must not fail the analysis."""
+    try:
+        profiles = profile_tables(
+            request.db_type,
+            request.host,
+            request.username,
+            request.password,
+            request.database_name,
+            schema_info,
+            deadline_seconds=ANALYSIS_PROFILE_BUDGET_SECONDS
+        )
+        return format_profile_for_prompt(profiles)
+    except Exception as e:
+        logger.warning("Profiling skipped for %s: %s", request.database_name, e)
+        return ""
+
+
+def _ndjson(names: Iterator[str]) -> Iterator[str]:
+    for name in names:
+        yield json.dumps(name) + "\n"
+
+
+def _index_schemas(request: AnalyzeSchemaRequest, schema_info: dict):
+    """Keep the similarity index current with schemas we fetched anyway; best effort."""
+    try:
+        index_table_schemas(request.db_type, request.host, request.database_name, schema_info)
+    except Exception as e:
+        logger.warning("Schema indexing skipped for %s: %s", request.database_name, e)
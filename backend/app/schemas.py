@@ -11,6 +11,17 @@ class DBConnectionRequest(BaseModel):
 class AnalyzeSchemaRequest(DBConnectionRequest):
     prompt: str = Field(..., example="Generate optimized star schema")
     selected_tables: List[str] = Field(..., example=["orders", "customers"])
+    include_profile: bool = Field(True, example=True)  # Feed sampled column statistics to the LLM
+
+class ProfileTablesRequest(DBConnectionRequest):
+    selected_tables: List[str] = Field(..., example=["orders", "customers"])
+
+class SimilarTablesRequest(BaseModel):
+    host: str = Field(..., example="localhost")
+    database_name: str = Field(..., example="mydb")
+    table: str = Field(..., example="customers")
+    k: int = Field(10, ge=1, le=100, example=10)
+    exclude_same_database: bool = Field(False, example=True)
 
 class ChatHistoryItem(BaseModel):
     id: str  # Unique identifier for the history item
@@ -5,3 +5,7 @@ embedder = SentenceTransformer('all-MiniLM-L6-v2')
 
 def get_embedding(text: str) -> list[float]:
     return embedder.encode(text).tolist()
+
+def get_embeddings(texts: list[str]) -> list[list[float]]:
+    """Batch variant of get_embedding; one forward pass per batch instead of per text."""
+    return embedder.encode(texts, batch_size=64).tolist()
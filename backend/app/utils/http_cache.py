@@ -0,0 +1,37 @@
+import hashlib
+from typing import Any
+
+import orjson
+from fastapi import Request, Response, status
+
+
+def etag_json_response(request: Request, content: Any) -> Response:
+    """Serialize with orjson and answer 304 when a GET/HEAD client already has this payload.
+
+    The body is returned as raw bytes, so FastAPI skips response_model validation;
+    only use this for data we built ourselves. The ETag is weak because the
+    compression middleware changes the bytes on the wire. For other methods a
+    matching If-None-Match is a failed precondition (412), per RFC 9110.
+    """
+    body = orjson.dumps(content)
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        if request.method in ("GET", "HEAD"):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(status_code=status.HTTP_412_PRECONDITION_FAILED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored on both sides
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
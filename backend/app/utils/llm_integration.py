@@ -1,9 +1,11 @@
+import time
 import uuid
 import ollama
 import logging
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from app.utils.vector_db import add_message_to_history, get_relevant_history
 from app.utils.embeddings import get_embedding
+from app.utils.model_router import PromptTooLargeError, select_route, record_outcome
 
 logger = logging.getLogger("schema_verification.llm")
 
@@ -22,30 +24,33 @@ def analyze_schema(
     prompt: str,
     schema_info: str,
     selected_tables: List[str],
-    database_name: str
+    database_name: str,
+    profile: str = ""
 ) -> Dict:
     """
     Enterprise-Grade Schema Analysis with Conversation Tracking.
-    Returns analysis, DDL, context_used, and conversation_id.
+    Returns analysis, DDL, context_used, model, and conversation_id.
     """
     global current_conversation_id
     try:
         # Start new conversation if none exists
         if not current_conversation_id:
             current_conversation_id = f"conv_{uuid.uuid4()}"
-            logger.info(f"New conversation started: {current_conversation_id}")
+            logger.info("New conversation started: %s", current_conversation_id)
 
-        logger.info(f"Analysis initiated | DB: {database_name} | Tables: {selected_tables}")
+        logger.info("Analysis initiated | DB: %s | Tables: %s", database_name, selected_tables)
 
         # 1. Context Retrieval
         query_embedding = get_embedding(prompt)
         context = _get_enhanced_context(query_embedding, database_name, selected_tables)
 
-        # 2. LLM Prompt Engineering
-        messages = _build_llm_messages(prompt, schema_info, context, database_name, selected_tables)
+        # 2. LLM Prompt Engineering, on a model sized for the request
+        messages, route, context = _build_routed_messages(
+            prompt, schema_info, context, database_name, selected_tables, profile
+        )
 
         # 3. LLM Execution
-        response = _safe_llm_call(messages)
+        response = _safe_llm_call(messages, route)
         analysis = _validate_llm_response(response)
 
         # 4. Atomic Storage with conversation ID
@@ -64,11 +69,12 @@ def analyze_schema(
             "analysis": analysis,
             "ddl": _extract_ddl(analysis),
             "context_used": bool(context),
+            "model": route["model"],
             "conversation_id": current_conversation_id
         }
 
     except Exception as e:
-        logger.error(f"Analysis failed | DB: {database_name} | Error: {str(e)}", exc_info=True)
+        logger.error("Analysis failed | DB: %s | Error: %s", database_name, e, exc_info=True)
         raise
 
 # --- Helper Functions ---
@@ -91,11 +97,15 @@ def _get_enhanced_context(embedding: List[float], database: str, tables: List[st
         ]
         return "\n".join([f"Related Q: {q}\nA: {a}" for q, a in filtered[:3]])
     except Exception as e:
-        logger.warning(f"Context retrieval failed: {str(e)}")
+        logger.warning("Context retrieval failed: %s", e)
         return ""
 
-def _build_llm_messages(prompt: str, schema: str, context: str, db: str, tables: List[str]) -> List[Dict]:
+def _build_llm_messages(prompt: str, schema: str, context: str, db: str, tables: List[str],
+                        profile: str = "") -> List[Dict]:
     """Structured Prompt Engineering."""
+    user_content = f"Query: {prompt}\nSchema Details:\n{schema}"
+    if profile:
+        user_content += f"\nColumn Profile (sampled):\n{profile}"
     return [
         {
             "role": "system",
@@ -104,35 +114,57 @@ def _build_llm_messages(prompt: str, schema: str, context: str, db: str, tables:
             Rules:
             1. Generate ANSI-SQL DDL with constraints
             2. Prefer star schema for analytics
-            3. Add indexes for frequent query columns
+            3. Add indexes for selective, high-cardinality columns; use the column profile when given
             4. Include column comments
             Context:\n{context}"""
         },
         {
             "role": "user",
-            "content": f"Query: {prompt}\nSchema Details:\n{schema}"
+            "content": user_content
         }
     ]
 
-def _safe_llm_call(messages: List[Dict], retries: int = 3) -> Dict:
-    """Robust LLM Communication."""
+def _build_routed_messages(prompt: str, schema: str, context: str, db: str, tables: List[str],
+                           profile: str = "") -> Tuple[List[Dict], Dict, str]:
+    """Pick a route, dropping the optional profile and then history context if nothing fits.
+
+    Returns the messages, the route and the context actually sent. Only raises
+    PromptTooLargeError when the query and schema alone are too large.
+    """
+    attempts = [(profile, context)]
+    if profile:
+        attempts.append(("", context))
+    if context:
+        attempts.append(("", ""))
+    for index, (attempt_profile, attempt_context) in enumerate(attempts):
+        messages = _build_llm_messages(prompt, schema, attempt_context, db, tables, attempt_profile)
+        try:
+            return messages, select_route(messages, tables, prompt), attempt_context
+        except PromptTooLargeError:
+            if index == len(attempts) - 1:
+                raise
+            logger.warning(
+                "Prompt too large, retrying without %s | DB: %s",
+                "column profile" if attempt_profile else "history context", db
+            )
+
+def _safe_llm_call(messages: List[Dict], route: Dict, retries: int = 3) -> Dict:
+    """Robust LLM Communication, recording latency against the chosen route."""
+    started = time.perf_counter()
     for attempt in range(retries):
         try:
-            return ollama.chat(
-                model="llama3.2",
+            response = ollama.chat(
+                model=route["model"],
                 messages=messages,
-                options={
-                    "temperature": 0.3,
-                    "num_ctx": 4096,
-                    "num_predict": 4096,
-                    "top_k": 20,
-                    "stop": []
-                }
+                options=route["options"]
             )
+            record_outcome(route, time.perf_counter() - started, True, response)
+            return response
         except Exception as e:
             if attempt == retries - 1:
+                record_outcome(route, time.perf_counter() - started, False)
                 raise
-            logger.warning(f"LLM call failed (attempt {attempt+1}): {str(e)}")
+            logger.warning("LLM call failed (attempt %s): %s", attempt + 1, e)
 
 def _validate_llm_response(response: Dict) -> str:
     """Response Validation."""
@@ -0,0 +1,199 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("schema_verification.model_router")
+
+# Ordered smallest first; the first route whose limits fit the request wins.
+# None means unbounded, except that the prompt must always leave room for
+# num_predict inside num_ctx. num_ctx is sent as-is on every call: Ollama keeps
+# one runner per model and reloads it whenever num_ctx changes, so routes only
+# save time when they point at different models. Routes sharing a model should
+# be rare (here only oversized requests switch to "large") or share num_ctx.
+# The defaults use llama3.2, the one model a deployment is already expected to
+# have pulled; point routes at other models with a JSON list in LLM_MODEL_ROUTES.
+DEFAULT_MODEL_ROUTES = [
+    {
+        "name": "standard",
+        "model": "llama3.2",
+        "kinds": ["question", "design"],
+        "max_tables": 15,
+        "max_prompt_tokens": None,
+        "num_ctx": 8192,
+        "num_predict": 4096,
+    },
+    {
+        "name": "large",
+        "model": "llama3.2",
+        "kinds": ["question", "design"],
+        "max_tables": None,
+        "max_prompt_tokens": None,
+        "num_ctx": 32768,
+        "num_predict": 8192,
+    },
+]
+
+# Requests asking us to produce a model or DDL need more output and reasoning than lookups
+_DESIGN_PATTERN = re.compile(
+    r"\b(star schema|snowflake|ddl|create|design|model|normali[sz]e|denormali[sz]e|"
+    r"migrat\w*|refactor|partition\w*|fact|dimension\w*)\b",
+    re.IGNORECASE
+)
+# Rough rule of thumb for English/SQL text with Llama tokenizers
+_CHARS_PER_TOKEN = 4
+
+_stats_lock = threading.Lock()
+_route_stats: Dict[str, Dict] = {}
+_recent_decisions = deque(maxlen=200)
+
+
+def load_routes() -> List[Dict]:
+    raw = os.getenv("LLM_MODEL_ROUTES")
+    if not raw:
+        return DEFAULT_MODEL_ROUTES
+    try:
+        routes = json.loads(raw)
+        if not isinstance(routes, list) or not routes:
+            raise ValueError("expected a non-empty list")
+        return routes
+    except ValueError as e:
+        logger.warning("Ignoring invalid LLM_MODEL_ROUTES: %s", e)
+        return DEFAULT_MODEL_ROUTES
+
+
+MODEL_ROUTES = load_routes()
+
+
+class PromptTooLargeError(ValueError):
+    """No configured route can take the prompt and still leave room for the answer."""
+
+
+def select_route(messages: List[Dict], selected_tables: List[str], prompt: str) -> Dict:
+    """Pick a model and generation settings for this request.
+
+    Returns the route name, model and ollama options, plus the features the
+    decision was based on so it can be recorded alongside the latency. Raises
+    PromptTooLargeError when no route has room for the prompt and a full answer,
+    rather than letting Ollama truncate it.
+    """
+    kind = classify_request(prompt)
+    prompt_tokens = estimate_tokens(messages)
+    table_count = len(selected_tables)
+
+    route = next(
+        (candidate for candidate in MODEL_ROUTES if _fits(candidate, kind, table_count, prompt_tokens)),
+        None
+    )
+    if route is None:
+        largest = max(_prompt_budget(candidate) for candidate in MODEL_ROUTES)
+        logger.warning(
+            "No LLM route fits request | kind: %s, tables: %s, est_tokens: %s, largest budget: %s",
+            kind, table_count, prompt_tokens, largest
+        )
+        raise PromptTooLargeError(
+            f"Request too large for the configured models (~{prompt_tokens} prompt tokens, "
+            f"limit {largest}). Select fewer tables."
+        )
+
+    decision = {
+        "route": route["name"],
+        "model": route["model"],
+        "kind": kind,
+        "tables": table_count,
+        "prompt_tokens": prompt_tokens,
+        "options": {
+            "temperature": 0.3,
+            "num_ctx": route["num_ctx"],
+            "num_predict": route["num_predict"],
+            "top_k": 20,
+            "stop": []
+        }
+    }
+    logger.info(
+        "LLM route selected | route: %s, model: %s, kind: %s, tables: %s, est_tokens: %s, num_ctx: %s",
+        route["name"], route["model"], kind, table_count, prompt_tokens, decision["options"]["num_ctx"]
+    )
+    return decision
+
+
+def classify_request(prompt: str) -> str:
+    return "design" if _DESIGN_PATTERN.search(prompt) else "question"
+
+
+def estimate_tokens(messages: List[Dict]) -> int:
+    return sum(len(message["content"]) for message in messages) // _CHARS_PER_TOKEN + 1
+
+
+def record_outcome(decision: Dict, latency_s: float, success: bool,
+                   response: Optional[Dict] = None):
+    """Track per-route latency and token usage so the thresholds can be tuned."""
+    prompt_eval = (response or {}).get("prompt_eval_count")
+    eval_count = (response or {}).get("eval_count")
+    with _stats_lock:
+        stats = _route_stats.setdefault(decision["route"], {
+            "model": decision["model"],
+            "calls": 0,
+            "errors": 0,
+            "total_latency_s": 0.0,
+            "max_latency_s": 0.0,
+        })
+        stats["calls"] += 1
+        stats["errors"] += 0 if success else 1
+        stats["total_latency_s"] += latency_s
+        stats["max_latency_s"] = max(stats["max_latency_s"], latency_s)
+        _recent_decisions.append({
+            "route": decision["route"],
+            "model": decision["model"],
+            "kind": decision["kind"],
+            "tables": decision["tables"],
+            "estimated_prompt_tokens": decision["prompt_tokens"],
+            "prompt_tokens": prompt_eval,
+            "output_tokens": eval_count,
+            "num_ctx": decision["options"]["num_ctx"],
+            "latency_s": round(latency_s, 3),
+            "success": success,
+        })
+    logger.info(
+        "LLM call finished | route: %s, model: %s, latency: %.2fs, success: %s, "
+        "prompt_tokens: %s, output_tokens: %s",
+        decision["route"], decision["model"], latency_s, success, prompt_eval, eval_count
+    )
+
+
+def get_routing_stats() -> Dict:
+    with _stats_lock:
+        routes = {
+            name: {
+                **stats,
+                "avg_latency_s": stats["total_latency_s"] / stats["calls"] if stats["calls"] else 0.0,
+            }
+            for name, stats in _route_stats.items()
+        }
+        return {
+            "routes": routes,
+            "recent": list(_recent_decisions),
+            "config": MODEL_ROUTES,
+        }
+
+
+# Helper functions ------------------------------------------------------------
+
+def _fits(route: Dict, kind: str, table_count: int, prompt_tokens: int) -> bool:
+    if kind not in route.get("kinds", [kind]):
+        return False
+    max_tables = route.get("max_tables")
+    if max_tables is not None and table_count > max_tables:
+        return False
+    return prompt_tokens <= _prompt_budget(route)
+
+
+def _prompt_budget(route: Dict) -> int:
+    """Prompt tokens a route accepts while still leaving num_predict for the answer."""
+    budget = route["num_ctx"] - route["num_predict"]
+    max_prompt_tokens = route.get("max_prompt_tokens")
+    return budget if max_prompt_tokens is None else min(max_prompt_tokens, budget)
+
@@ -0,0 +1,211 @@
+from datetime import datetime
+import hashlib
+import logging
+import re
+from typing import Dict, Iterable, List, Optional
+
+from app.utils.embeddings import get_embeddings
+from app.utils.vector_db import client
+
+logger = logging.getLogger("schema_verification.schema_index")
+
+# Cosine distance so similarity scores are comparable across tables of any width
+schema_collection = client.get_or_create_collection(
+    "table_schemas",
+    metadata={"hnsw:space": "cosine"}
+)
+
+# Collapse vendor-specific spellings so the same logical column embeds the same way everywhere
+_TYPE_FAMILIES = [
+    ("integer", re.compile(r"^(tiny|small|medium|big)?int(eger)?\d*$|^serial|^bigserial")),
+    ("numeric", re.compile(r"^(decimal|numeric|float|double|real|money|smallmoney|number)")),
+    ("boolean", re.compile(r"^(bool|boolean|bit)$")),
+    ("timestamp", re.compile(r"^(datetime|timestamp|smalldatetime|datetime2|datetimeoffset)")),
+    ("date", re.compile(r"^date$")),
+    ("time", re.compile(r"^time")),
+    ("uuid", re.compile(r"^(uuid|uniqueidentifier)$")),
+    ("json", re.compile(r"^jsonb?$")),
+    ("binary", re.compile(r"(binary|blob|bytea|image)")),
+    ("string", re.compile(r"(char|text|string|enum|set|xml)")),
+]
+
+# Names ending in one of these words identify or join rows, which is what makes two tables alike
+_KEY_WORDS = {"id", "key", "code", "uuid", "guid"}
+# all-MiniLM-L6-v2 truncates at 256 word pieces (~7 per column), so choose what gets cut ourselves
+_MAX_EMBEDDED_COLUMNS = 32
+
+_UPSERT_BATCH_SIZE = 500
+
+
+def index_table_schemas(db_type: str, host: str, database_name: str,
+                        schemas: Dict[str, List[dict]]) -> Dict[str, int]:
+    """Embed and store the given table schemas, skipping tables whose schema is unchanged.
+
+    ``schemas`` is the output of ``get_table_schemas``. Tables without columns
+    (no access, or dropped mid-refresh) are skipped rather than indexed as a bare name.
+    """
+    host = normalize_host(host)
+    entries = {
+        table_id(host, database_name, table): (table, normalize_schema(table, columns), columns)
+        for table, columns in schemas.items()
+        if columns
+    }
+    if not entries:
+        return {"indexed": 0, "unchanged": 0}
+
+    existing = schema_collection.get(ids=list(entries), include=["metadatas"])
+    known = {
+        entry_id: metadata.get("fingerprint")
+        for entry_id, metadata in zip(existing["ids"], existing["metadatas"])
+    }
+
+    changed = []
+    for entry_id, (table, document, columns) in entries.items():
+        fingerprint = _fingerprint(document)
+        if known.get(entry_id) != fingerprint:
+            changed.append((entry_id, table, document, columns, fingerprint))
+
+    indexed_at = datetime.utcnow().isoformat()
+    for start in range(0, len(changed), _UPSERT_BATCH_SIZE):
+        batch = changed[start:start + _UPSERT_BATCH_SIZE]
+        documents = [document for _, _, document, _, _ in batch]
+        schema_collection.upsert(
+            ids=[entry_id for entry_id, _, _, _, _ in batch],
+            documents=documents,
+            embeddings=get_embeddings(documents),
+            metadatas=[
+                {
+                    "db_type": db_type,
+                    "host": host,
+                    "database": database_name,
+                    "table": table,
+                    "column_count": len(columns),
+                    "fingerprint": fingerprint,
+                    "indexed_at": indexed_at,
+                }
+                for _, table, _, columns, fingerprint in batch
+            ]
+        )
+
+    logger.info(
+        "Schema index updated | db: %s, indexed: %s, unchanged: %s",
+        database_name, len(changed), len(entries) - len(changed)
+    )
+    return {"indexed": len(changed), "unchanged": len(entries) - len(changed)}
+
+
+def prune_missing_tables(host: str, database_name: str, current_tables: Iterable[str]) -> int:
+    """Drop index entries for tables that no longer exist in the database."""
+    host = normalize_host(host)
+    result = schema_collection.get(
+        where={"$and": [{"host": {"$eq": host}}, {"database": {"$eq": database_name}}]},
+        include=[]
+    )
+    current = {table_id(host, database_name, table) for table in current_tables}
+    stale = [entry_id for entry_id in result["ids"] if entry_id not in current]
+    if stale:
+        schema_collection.delete(ids=stale)
+        logger.info("Pruned %s dropped tables from schema index | db: %s", len(stale), database_name)
+    return len(stale)
+
+
+def find_similar_tables(host: str, database_name: str, table: str, k: int = 10,
+                        exclude_same_database: bool = False) -> Optional[List[Dict]]:
+    """Top-k indexed tables whose schema is closest to an already indexed table.
+
+    Uses the stored embedding, so no database is touched at query time. Returns
+    None if the reference table has not been indexed yet.
+    """
+    host = normalize_host(host)
+    reference_id = table_id(host, database_name, table)
+    reference = schema_collection.get(ids=[reference_id], include=["embeddings"])
+    if not reference["ids"]:
+        return None
+
+    where = None
+    if exclude_same_database:
+        where = {"$or": [{"host": {"$ne": host}}, {"database": {"$ne": database_name}}]}
+
+    results = schema_collection.query(
+        query_embeddings=[list(reference["embeddings"][0])],
+        n_results=k + 1,  # The reference table is its own nearest neighbour
+        where=where,
+        include=["metadatas", "documents", "distances"]
+    )
+
+    matches = []
+    for entry_id, metadata, document, distance in zip(
+        results["ids"][0], results["metadatas"][0], results["documents"][0], results["distances"][0]
+    ):
+        if entry_id == reference_id:
+            continue
+        matches.append({
+            "db_type": metadata.get("db_type"),
+            "host": metadata.get("host"),
+            "database": metadata.get("database"),
+            "table": metadata.get("table"),
+            "column_count": metadata.get("column_count"),
+            "similarity": round(1 - distance, 4),
+            "schema": document,
+        })
+    return matches[:k]
+
+
+def table_id(host: str, database_name: str, table: str) -> str:
+    """Stable entry id. Only the host is case-folded: database and table names can be
+    case-sensitive (Postgres "Orders" and orders are different tables)."""
+    return hashlib.sha1(
+        f"{normalize_host(host)}|{database_name}|{table}".encode("utf-8")
+    ).hexdigest()
+
+
+def normalize_host(host: str) -> str:
+    """Host names are case-insensitive; fold them the same way in ids, metadata and filters."""
+    return host.strip().lower()
+
+
+def normalize_schema(table: str, columns: List[dict]) -> str:
+    """Vendor-neutral text form of a table: name words plus type-family columns.
+
+    Key-like columns come first, then NOT NULL ones, then the rest, alphabetical
+    within each group so the text does not depend on column order in the database.
+    Only the first ``_MAX_EMBEDDED_COLUMNS`` are spelled out; the rest are counted.
+    """
+    ranked = []
+    for column in columns:
+        name = _normalize_name(column["name"])
+        not_null = not column.get("nullable", True)
+        part = f"{name} {_type_family(column['type'])}" + (" not null" if not_null else "")
+        ranked.append((_column_rank(name, not_null), part))
+    parts = [part for _, part in sorted(ranked)]
+    text = f"table {_normalize_name(table)}: " + ", ".join(parts[:_MAX_EMBEDDED_COLUMNS])
+    if len(parts) > _MAX_EMBEDDED_COLUMNS:
+        text += f", +{len(parts) - _MAX_EMBEDDED_COLUMNS} more"
+    return text
+
+
+# Helper functions ------------------------------------------------------------
+
+def _normalize_name(name: str) -> str:
+    """customerID / Customer_Id / customer-id all become 'customer id'."""
+    words = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", name)
+    return " ".join(re.split(r"[\W_]+", words.lower())).strip()
+
+
+def _column_rank(name: str, not_null: bool) -> int:
+    """0 for key-like columns, 1 for other NOT NULL columns, 2 for the rest."""
+    if name.rsplit(" ", 1)[-1] in _KEY_WORDS:
+        return 0
+    return 1 if not_null else 2
+
+
+def _type_family(data_type: str) -> str:
+    data_type = data_type.lower().strip()
+    for family, pattern in _TYPE_FAMILIES:
+        if pattern.search(data_type):
+            return family
+    return data_type
+
+
+def _fingerprint(document: str) -> str:
+    return hashlib.sha256(document.encode("utf-8")).hexdigest()
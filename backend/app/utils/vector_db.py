@@ -52,10 +52,10 @@ def add_message_to_history(
             ],
             ids=[f"user_{pair_uuid}", f"assistant_{pair_uuid}"]
         )
-        logger.info(f"Stored conversation pair: user_{pair_uuid}, assistant_{pair_uuid}")
+        logger.info("Stored conversation pair: user_%s, assistant_%s", pair_uuid, pair_uuid)
         
     except Exception as e:
-        logger.error(f"Storage failed: {str(e)}", exc_info=True)
+        logger.error("Storage failed: %s", e, exc_info=True)
         raise
 
 
@@ -70,7 +70,7 @@ def get_relevant_history(query_embedding: list[float], k: int = 3, where: dict =
         )
         return results['documents'][0] if results['documents'] else []
     except Exception as e:
-        logger.error(f"Query failed: {str(e)}", exc_info=True)
+        logger.error("Query failed: %s", e, exc_info=True)
         return []
 
 def delete_conversation_by_id(conversation_id: str):
@@ -87,8 +87,8 @@ def delete_conversation_by_id(conversation_id: str):
         
         if result["ids"]:
             collection.delete(ids=result["ids"])
-            logger.info(f"Deleted {len(result['ids'])} messages in conversation {conversation_id}")
+            logger.info("Deleted %s messages in conversation %s", len(result['ids']), conversation_id)
             
     except Exception as e:
-        logger.error(f"Conversation deletion failed: {str(e)}")
+        logger.error("Conversation deletion failed: %s", e)
         raise
@@ -0,0 +1,113 @@
+"""Per-request logging overhead: synchronous handlers vs the queue pipeline.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_logging
+
+Each simulated request emits the same mix of calls as an analysis request
+(a few INFO lines plus a hot DEBUG loop). Only time spent on the calling
+thread is measured, since that is what adds to request latency. The queue is
+measured with DEBUG sampling off and on as separate rows: with sampling on
+most DEBUG records are dropped, so that row is not a like-for-like comparison.
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+from app import logging_config
+
+REQUESTS = 2000
+DEBUG_CALLS_PER_REQUEST = 20
+
+logger = logging.getLogger("schema_verification.bench")
+
+
+def simulate_request(i: int):
+    logger.info("Schema analysis started for %s (tables: %s)", "sales", ["orders", "customers"])
+    for table in range(DEBUG_CALLS_PER_REQUEST):
+        logger.debug("Processing table: %s", table)
+    logger.info("Analysis completed for %s | request %s", "sales", i)
+
+
+def run() -> float:
+    started = time.perf_counter()
+    for i in range(REQUESTS):
+        simulate_request(i)
+    return (time.perf_counter() - started) / REQUESTS * 1e6
+
+
+def configure_sync(log_file: str):
+    """The previous setup: file and console handlers called inline."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format=logging_config.TEXT_FORMAT,
+        handlers=[
+            RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5),
+            logging.StreamHandler(open(os.devnull, "w"))
+        ],
+        force=True
+    )
+
+
+def configure_queued(log_file: str, debug_rate_limit: int):
+    """The queue pipeline; debug_rate_limit=0 turns DEBUG sampling off."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    # Same text format as the synchronous run so only the delivery path differs
+    logging_config.configure_logging(
+        level="DEBUG", log_file=log_file, json_logs=False, debug_rate_limit=debug_rate_limit
+    )
+    # Keep console output out of the measurement, as in the synchronous run
+    for handler in logging_config._listener.handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setStream(open(os.devnull, "w"))
+
+
+def run_queued(log_file: str, debug_rate_limit: int):
+    configure_queued(log_file, debug_rate_limit)
+    per_request_us = run()
+    drain_started = time.perf_counter()
+    logging_config.stop_logging()
+    return per_request_us, time.perf_counter() - drain_started
+
+
+def count_lines(path: str) -> int:
+    with open(path) as f:
+        return sum(1 for _ in f)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_log = os.path.join(tmp, "sync.log")
+        configure_sync(sync_log)
+        sync_us = run()
+        logging.shutdown()
+
+        unsampled_log = os.path.join(tmp, "queued.log")
+        unsampled_us, unsampled_drain = run_queued(unsampled_log, debug_rate_limit=0)
+
+        sampled_log = os.path.join(tmp, "sampled.log")
+        sampled_us, sampled_drain = run_queued(sampled_log, debug_rate_limit=20)
+
+        rows = [
+            ("synchronous handlers", sync_us, count_lines(sync_log), None),
+            ("queue, sampling off", unsampled_us, count_lines(unsampled_log), unsampled_drain),
+            ("queue, sampling on", sampled_us, count_lines(sampled_log), sampled_drain),
+        ]
+
+    print(f"requests: {REQUESTS}, log calls per request: {DEBUG_CALLS_PER_REQUEST + 2}", file=sys.stderr)
+    print(f"{'pipeline':<22} {'us/request':>10} {'speedup':>8} {'lines written':>14} {'drain':>7}")
+    for name, per_request_us, lines, drain_s in rows:
+        drain = "" if drain_s is None else f"{drain_s:.2f}s"
+        print(f"{name:<22} {per_request_us:>10.1f} {sync_us / per_request_us:>7.1f}x {lines:>14} {drain:>7}")
+
+
+if __name__ == "__main__":
+    main()
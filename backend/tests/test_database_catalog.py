@@ -0,0 +1,70 @@
+import pytest
+
+from app.database import (
+    _build_catalog_query,
+    _escape_like,
+    _glob_to_like,
+    decode_page_token,
+    encode_page_token,
+)
+
+
+def test_page_token_round_trips_two_column_key():
+    token = encode_page_token(("sales", "orders"))
+    assert decode_page_token(token, 2) == ("sales", "orders")
+
+
+def test_page_token_round_trips_non_ascii_name():
+    token = encode_page_token(("kündenstamm",))
+    assert decode_page_token(token, 1) == ("kündenstamm",)
+
+
+@pytest.mark.parametrize("token", ["not base64!", encode_page_token(("only_one",))])
+def test_page_token_rejects_garbage_and_wrong_width(token):
+    with pytest.raises(ValueError):
+        decode_page_token(token, 2)
+
+
+def test_escape_like_escapes_wildcards_and_escape_char():
+    assert _escape_like("postgres", "a_b%c!d") == "a!_b!%c!!d"
+
+
+def test_escape_like_escapes_brackets_only_for_sqlserver():
+    assert _escape_like("sqlserver", "[x]") == "![x]"
+    assert _escape_like("mysql", "[x]") == "[x]"
+
+
+def test_glob_to_like_translates_wildcards_and_escapes_literals():
+    assert _glob_to_like("postgres", "dim_*_v?") == "dim!_%!_v_"
+
+
+def test_sqlserver_tables_page_on_schema_and_name():
+    query, params = _build_catalog_query("sqlserver", "tables", None, None, ("dbo", "orders"), 11)
+    assert query.startswith("SELECT TOP (11) table_schema, table_name FROM information_schema.tables")
+    assert "(table_schema > ? OR (table_schema = ? AND table_name > ?))" in query
+    assert query.endswith("ORDER BY table_schema, table_name")
+    assert params == ("dbo", "dbo", "orders")
+
+
+def test_postgres_databases_single_key_with_filters():
+    query, params = _build_catalog_query("postgres", "databases", "ord_", "*_2024", ("abc",), 501)
+    assert query == (
+        "SELECT datname FROM pg_database WHERE datistemplate = false"
+        " AND datname LIKE %s ESCAPE '!' AND datname LIKE %s ESCAPE '!'"
+        " AND datname > %s ORDER BY datname LIMIT 501"
+    )
+    assert params == ("ord!_%", "%!_2024", "abc")
+
+
+def test_mysql_tables_use_current_database_and_no_limit_when_streaming():
+    query, params = _build_catalog_query("mysql", "tables", None, None, None, None)
+    assert query == (
+        "SELECT table_name FROM information_schema.tables"
+        " WHERE table_schema = DATABASE() ORDER BY table_name"
+    )
+    assert params == ()
+
+
+def test_unsupported_database_type_raises():
+    with pytest.raises(ValueError):
+        _build_catalog_query("oracle", "tables", None, None, None, None)
@@ -0,0 +1,59 @@
+import json
+import logging
+import queue
+import sys
+
+from app.logging_config import JsonFormatter, RedactingFormatter, _SnapshotQueueHandler, redact
+
+
+def _record(msg, args=(), exc_info=None, **extra):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_redact_masks_odbc_connection_string_password():
+    conn_str = "DRIVER={ODBC Driver 17};SERVER=db;UID=sa;PWD=s3cr3t;DATABASE=x"
+    assert redact(conn_str) == "DRIVER={ODBC Driver 17};SERVER=db;UID=sa;PWD=***;DATABASE=x"
+
+
+def test_redact_masks_quoted_values_in_dict_repr():
+    assert redact("{'user': 'a', 'password': 'hunter2'}") == "{'user': 'a', 'password': ***}"
+
+
+def test_redact_masks_secret_keys_at_any_depth():
+    payload = {"ctx": {"api_key": "k", "items": [{"token": "t", "name": "n"}]}, "user": "a"}
+    assert redact(payload) == {"ctx": {"api_key": "***", "items": [{"token": "***", "name": "n"}]}, "user": "a"}
+
+
+def test_redact_leaves_non_secret_text_alone():
+    assert redact("Found 12 tables in sales") == "Found 12 tables in sales"
+
+
+def test_json_formatter_redacts_extra_fields():
+    line = JsonFormatter().format(_record("connecting", password="leak", ctx={"pwd": "x", "db": "sales"}))
+    payload = json.loads(line)
+    assert payload["password"] == "***"
+    assert payload["ctx"] == {"pwd": "***", "db": "sales"}
+    assert "leak" not in line
+
+
+def test_formatters_redact_exception_text():
+    try:
+        raise RuntimeError("password=zzz")
+    except RuntimeError:
+        exc_info = sys.exc_info()
+    json_line = JsonFormatter().format(_record("failed", exc_info=exc_info))
+    text_line = RedactingFormatter("%(message)s").format(_record("failed", exc_info=exc_info))
+    assert "zzz" not in json_line
+    assert "zzz" not in text_line
+    assert "password=***" in text_line
+
+
+def test_queue_handler_snapshots_message_before_args_mutate():
+    log_queue = queue.Queue()
+    handler = _SnapshotQueueHandler(log_queue)
+    tables = ["a"]
+    handler.handle(_record("tables=%s", (tables,)))
+    tables.append("MUTATED")
+    assert log_queue.get_nowait().getMessage() == "tables=['a']"
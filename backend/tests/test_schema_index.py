@@ -0,0 +1,77 @@
+import pytest
+
+from app.utils import schema_index
+from app.utils.schema_index import _normalize_name, _type_family, normalize_schema
+
+
+@pytest.mark.parametrize("data_type, family", [
+    ("int", "integer"),
+    ("BIGINT", "integer"),
+    ("tinyint", "integer"),
+    ("bigserial", "integer"),
+    ("numeric", "numeric"),
+    ("double precision", "numeric"),
+    ("money", "numeric"),
+    ("bit", "boolean"),
+    ("boolean", "boolean"),
+    ("datetime2", "timestamp"),
+    ("timestamp without time zone", "timestamp"),
+    ("date", "date"),
+    ("time", "time"),
+    ("uniqueidentifier", "uuid"),
+    ("jsonb", "json"),
+    ("varbinary", "binary"),
+    ("bytea", "binary"),
+    ("nvarchar", "string"),
+    ("character varying", "string"),
+    ("longtext", "string"),
+])
+def test_type_family_folds_vendor_spellings(data_type, family):
+    assert _type_family(data_type) == family
+
+
+def test_type_family_keeps_unknown_types():
+    assert _type_family(" Geography ") == "geography"
+
+
+@pytest.mark.parametrize("name", ["customerID", "Customer_Id", "customer-id", "CUSTOMER_ID"])
+def test_normalize_name_splits_case_and_separators(name):
+    assert _normalize_name(name) == "customer id"
+
+
+def test_normalize_schema_is_vendor_neutral():
+    sql_server = [
+        {"name": "OrderID", "type": "int", "nullable": False},
+        {"name": "CreatedAt", "type": "datetime2", "nullable": True},
+    ]
+    postgres = [
+        {"name": "created_at", "type": "timestamp without time zone", "nullable": True},
+        {"name": "order_id", "type": "integer", "nullable": False},
+    ]
+    assert normalize_schema("Orders", sql_server) == normalize_schema("orders", postgres)
+
+
+def test_normalize_schema_puts_keys_then_not_null_first():
+    columns = [
+        {"name": "amount", "type": "decimal", "nullable": True},
+        {"name": "status", "type": "varchar", "nullable": False},
+        {"name": "customer_id", "type": "int", "nullable": True},
+        {"name": "id", "type": "int", "nullable": False},
+        {"name": "country_code", "type": "char", "nullable": True},
+    ]
+    assert normalize_schema("orders", columns) == (
+        "table orders: country code string, customer id integer, id integer not null, "
+        "status string not null, amount numeric"
+    )
+
+
+def test_normalize_schema_caps_columns_after_ordering(monkeypatch):
+    monkeypatch.setattr(schema_index, "_MAX_EMBEDDED_COLUMNS", 2)
+    columns = [
+        {"name": "notes", "type": "text", "nullable": True},
+        {"name": "order_id", "type": "int", "nullable": False},
+        {"name": "comment", "type": "text", "nullable": True},
+    ]
+    assert normalize_schema("orders", columns) == (
+        "table orders: order id integer not null, comment string, +1 more"
+    )